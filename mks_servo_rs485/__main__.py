@@ -0,0 +1,54 @@
+""" Command line monitor for the servos on a RS485 bus """
+import argparse
+import asyncio
+import logging
+from .aio import AsyncServo
+from .instrument import get_instrument
+from .scan import scan_modbus_cached
+from .servo import MotorType, Servo
+
+logger = logging.getLogger(__name__)
+
+POLL_STAGGER = 0.05
+
+
+async def watch_servo(servo: AsyncServo, start_delay: float, min_change: float) -> None:
+    """ Log the angle of the servo whenever it changes """
+    async for angle in servo.watch_angle(start_delay=start_delay, min_change=min_change):
+        logger.info("Servo %s: %.2f", servo.servo.address, angle)
+
+
+async def monitor(servos: list[AsyncServo], min_change: float) -> None:
+    """ Watch all servos in one event loop """
+    await asyncio.gather(*(watch_servo(servo, index * POLL_STAGGER, min_change) for index, servo in enumerate(servos)))
+
+
+def main() -> None:
+    """ Parse the arguments and monitor the servos """
+    parser = argparse.ArgumentParser(description="Log the angle of the servos on a RS485 bus")
+    parser.add_argument("port", help="Serial port of the RS485 adapter")
+    parser.add_argument("--baudrate", type=int, default=38400)
+    parser.add_argument("--motor-type", choices=[motor_type.value for motor_type in MotorType],
+                        default=MotorType.SERVO_42_D.value)
+    parser.add_argument("--address", type=int, action="append",
+                        help="Slave address of a servo, the bus is scanned if omitted")
+    parser.add_argument("--min-change", type=float, default=0.1,
+                        help="Smallest angle change in degrees that is reported")
+    parser.add_argument("--debug", action="store_true", help="Log the bus communication")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+
+    addresses = args.address or scan_modbus_cached(args.port, baudrate=args.baudrate)
+    instrument = get_instrument(args.port, args.baudrate)
+    servos = []
+    for address in addresses:
+        servo = Servo(instrument, MotorType(args.motor_type), address, max_current=0,
+                      hold_current_percent=0, full_steps=200, micro_steps=16)
+        servos.append(AsyncServo(servo))
+
+    asyncio.run(monitor(servos, args.min_change))
+
+
+if __name__ == "__main__":
+    main()
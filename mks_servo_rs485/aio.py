@@ -0,0 +1,144 @@
+""" This module provides an asyncio interface for the servo motor """
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+from .servo import (ANGLE_TO_AXIS, HOMING_START_TIMEOUT, STATUS_POLL_PERIOD, MotorDirection, MotorStatus,
+                    Servo)
+
+MOVING_STATUSES = frozenset({MotorStatus.SPEED_UP, MotorStatus.FULL_SPEED, MotorStatus.SPEED_DOWN, MotorStatus.HOMING})
+
+
+def create_bus_executor() -> ThreadPoolExecutor:
+    """ Create a single worker thread that serializes the Modbus calls of one bus """
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="mks-servo-bus")
+
+
+bus_executors: dict[str, ThreadPoolExecutor] = {}
+
+
+def get_bus_executor(port: str) -> ThreadPoolExecutor:
+    """ Get the worker thread shared by all servos on the specified serial port """
+    if port not in bus_executors:
+        bus_executors[port] = create_bus_executor()
+    return bus_executors[port]
+
+
+class AsyncServo:
+    """ Runs the blocking servo calls on a serial worker thread instead of the event loop """
+    servo: Servo
+    executor: ThreadPoolExecutor
+
+    def __init__(self, servo: Servo, executor: ThreadPoolExecutor | None = None):
+        self.servo = servo
+        self.executor = executor if executor is not None else get_bus_executor(servo.mb.serial.port)
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """ Run a blocking servo call on the bus worker thread """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(func, *args, **kwargs))
+
+    async def read_motor_status(self) -> MotorStatus:
+        """ Read the status of the motor """
+        return await self.run(self.servo.read_motor_status)
+
+    async def read_encoder_value_carry(self) -> tuple[int, int]:
+        """ Read the encoder value """
+        return await self.run(self.servo.read_encoder_value_carry)
+
+    async def read_speed_rpm(self) -> int:
+        """ Read the motor speed in RPM """
+        return await self.run(self.servo.read_speed_rpm)
+
+    async def read_number_of_pulses(self) -> int:
+        """ Read the number of pulses """
+        return await self.run(self.servo.read_number_of_pulses)
+
+    async def read_io(self, max_age: float = 0.0) -> tuple[bool, bool, bool, bool]:
+        """ Read the values of the servo's IO ports, reusing a read that is younger than max_age seconds """
+        return await self.run(self.servo.read_io, max_age)
+
+    async def read_error_of_angle(self) -> int:
+        """ Read the error of the angle """
+        return await self.run(self.servo.read_error_of_angle)
+
+    async def read_angle_carry(self) -> float:
+        """ Read the angle of the motor in degrees """
+        return await self.run(self.servo.read_angle_carry)
+
+    async def write_io(self, out1: bool, out2: bool) -> None:
+        """ Write the specified values to OUT1 and OUT2 IO ports """
+        await self.run(self.servo.write_io, out1, out2)
+
+    async def move_by_speed(self, direction: MotorDirection, acc: int, speed: int) -> None:
+        """ Move the motor at the specified speed """
+        await self.run(self.servo.move_by_speed, direction, acc, speed)
+
+    async def emergency_stop(self) -> None:
+        """ Stop the motor, moves do not hold the bus worker so this is sent right away """
+        await self.run(self.servo.emergency_stop)
+
+    async def move_relative_by_pulses(self, direction: MotorDirection, acc: int, speed: int, pulses: int) -> None:
+        """ Move the motor by the specified number of pulses """
+        await self.run(self.servo.start_move_relative_by_pulses, direction, acc, speed, pulses)
+        await self.wait_until_motor_status(MotorStatus.STOP)
+
+    async def move_absolute_by_pulses(self, acc: int, speed: int, pulses: int) -> None:
+        """ Move the motor to the specified number of pulses """
+        await self.run(self.servo.start_move_absolute_by_pulses, acc, speed, pulses)
+        await self.wait_until_motor_status(MotorStatus.STOP)
+
+    async def move_to_relative_angle(self, acc: int, speed: int, angle: float) -> None:
+        """ Move the motor by the specified angle """
+        await self.run(self.servo.start_move_to_relative_axis, acc, speed, int(angle * ANGLE_TO_AXIS))
+        await self.wait_until_motor_status(MotorStatus.STOP)
+
+    async def move_to_absolute_angle(self, acc: int, speed: int, angle: float) -> None:
+        """ Move the motor to the specified angle """
+        await self.run(self.servo.start_move_to_absolute_axis, acc, speed, int(angle * ANGLE_TO_AXIS))
+        await self.wait_until_motor_status(MotorStatus.STOP)
+
+    async def go_home(self) -> None:
+        """ Move the motor to the home position """
+        await self.run(self.servo.start_go_home)
+        # The motor may still report STOP right after the command, so wait for homing to start first
+        await self.wait_while_motor_status(MotorStatus.STOP, timeout=HOMING_START_TIMEOUT)
+        await self.wait_until_motor_status(MotorStatus.STOP)
+
+    async def wait_until_motor_status(self, scope_status: MotorStatus, poll_period: float = STATUS_POLL_PERIOD) -> None:
+        """ Wait until the motor reaches the specified status, leaving the bus free between polls """
+        while await self.read_motor_status() != scope_status:
+            await asyncio.sleep(poll_period)
+
+    async def wait_while_motor_status(self, scope_status: MotorStatus, timeout: float,
+                                      poll_period: float = STATUS_POLL_PERIOD) -> None:
+        """ Wait until the motor leaves the specified status or the timeout expires """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and await self.read_motor_status() == scope_status:
+            await asyncio.sleep(poll_period)
+
+    async def watch_angle(self, moving_period: float = 0.1, idle_period: float = 5.0,
+                          settle_time: float = 5.0, start_delay: float = 0.0,
+                          min_change: float = 0.0) -> AsyncIterator[float]:
+        """ Yield the angle whenever it changes by more than min_change, polling fast while moving and slow while idle """
+        # Offset the polling of servos sharing a bus so their polls do not line up
+        await asyncio.sleep(start_delay)
+        last_angle = None
+        last_change_ts = time.monotonic()
+        while True:
+            moving = await self.read_motor_status() in MOVING_STATUSES
+            # Idle ticks read the angle as well, a move that starts and ends between two of them is still reported
+            angle = await self.read_angle_carry()
+            if last_angle is None or abs(angle - last_angle) > min_change:
+                last_angle = angle
+                last_change_ts = time.monotonic()
+                yield angle
+            settling = time.monotonic() - last_change_ts < settle_time
+            await asyncio.sleep(moving_period if moving or settling else idle_period)
+
+
+async def read_angles(servos: list[AsyncServo]) -> list[float]:
+    """ Read the angles of several servos, concurrently across buses and queued within a bus """
+    return list(await asyncio.gather(*(servo.read_angle_carry() for servo in servos)))
@@ -0,0 +1,134 @@
+""" This module provides a Modbus RTU instrument tuned for the servo's response sizes """
+import time
+from functools import lru_cache
+import minimalmodbus
+from .rtu import (modbus_crc, read_input_registers_frame, registers_struct, write_register_frame,
+                  write_registers_frame)
+
+BITS_PER_CHARACTER = 11
+MIN_SILENT_INTERVAL = 1.75e-3
+RESPONSE_MARGIN = 0.02
+MAX_REGISTERS_TO_READ = 125
+MAX_REGISTERS_TO_WRITE = 123
+
+latest_frame_times: dict[str, float] = {}
+
+
+def frame_time(number_of_bytes: float, baudrate: int) -> float:
+    """ Time in seconds it takes to transfer the specified number of bytes """
+    return number_of_bytes * BITS_PER_CHARACTER / baudrate
+
+
+def silent_interval(baudrate: int) -> float:
+    """ Minimum silent interval of 3.5 characters between two Modbus RTU frames """
+    return max(MIN_SILENT_INTERVAL, frame_time(3.5, baudrate))
+
+
+def response_timeout(number_of_bytes: int, baudrate: int, margin: float = RESPONSE_MARGIN) -> float:
+    """ Serial timeout for a response of the specified size, margin covers the servo's processing time """
+    return frame_time(number_of_bytes, baudrate) + silent_interval(baudrate) + margin
+
+
+def check_register_value(value: int) -> None:
+    """ Check that the value fits into an unsigned 16 bit register """
+    if not isinstance(value, int):
+        raise TypeError(f"The register value must be an integer. Given: {value!r}")
+    if not 0 <= value <= 0xFFFF:
+        raise ValueError(f"The register value must be between 0 and 65535. Given: {value}")
+
+
+def check_number_of_registers(number_of_registers: int, max_number_of_registers: int) -> None:
+    """ Check that the number of registers fits into a single request """
+    if not 1 <= number_of_registers <= max_number_of_registers:
+        raise ValueError(f"The number of registers must be between 1 and {max_number_of_registers}. "
+                         f"Given: {number_of_registers}")
+
+
+class FastInstrument(minimalmodbus.Instrument):
+    """ Instrument that reads exactly the expected response within a timeout sized to it """
+    # Raise it for slow operations such as EEPROM writes, the port's own timeout stays the upper bound
+    response_margin: float = RESPONSE_MARGIN
+
+    def read_registers(self, registeraddress: int, number_of_registers: int, functioncode: int = 3) -> list[int]:
+        """ Read input registers with a cached request frame, other function codes use minimalmodbus """
+        if functioncode != 4:
+            return super().read_registers(registeraddress, number_of_registers, functioncode)
+        check_register_value(registeraddress)
+        check_number_of_registers(number_of_registers, MAX_REGISTERS_TO_READ)
+        request = read_input_registers_frame(self.address, registeraddress, number_of_registers)
+        response = self._communicate(request, 5 + 2 * number_of_registers)
+        self.check_response(request, response, 5 + 2 * number_of_registers)
+        if response[2] != 2 * number_of_registers:
+            raise minimalmodbus.InvalidResponseError(f"Wrong byte count in response: {response.hex()}")
+        return list(registers_struct(number_of_registers).unpack_from(response, 3))
+
+    def write_register(self, registeraddress: int, value: int | float, number_of_decimals: int = 0,
+                       functioncode: int = 16, signed: bool = False) -> None:
+        """ Write a plain register with function code 6 directly, other cases use minimalmodbus """
+        if functioncode != 6 or number_of_decimals or signed or not isinstance(value, int):
+            super().write_register(registeraddress, value, number_of_decimals, functioncode, signed)
+            return
+        check_register_value(registeraddress)
+        check_register_value(value)
+        request = write_register_frame(self.address, registeraddress, value)
+        response = self._communicate(request, 8)
+        self.check_response(request, response, 8)
+
+    def write_registers(self, registeraddress: int, values: list[int]) -> None:
+        """ Write consecutive registers with function code 16 """
+        if not isinstance(values, list):
+            raise TypeError(f"The values must be a list. Given: {values!r}")
+        check_register_value(registeraddress)
+        check_number_of_registers(len(values), MAX_REGISTERS_TO_WRITE)
+        for value in values:
+            check_register_value(value)
+        request = write_registers_frame(self.address, registeraddress, values)
+        response = self._communicate(request, 8)
+        self.check_response(request, response, 8)
+
+    def check_response(self, request: bytes | bytearray, response: bytes | bytearray, expected_length: int) -> None:
+        """ Check the response against the request it answers """
+        if len(response) >= 5 and response[0] == request[0] and response[1] == request[1] | 0x80:
+            raise minimalmodbus.SlaveReportedException(f"The slave reported exception code {response[2]}")
+        if len(response) != expected_length or modbus_crc(response) != 0:
+            raise minimalmodbus.InvalidResponseError(f"Invalid response: {response.hex()}")
+        if response[0] != request[0] or response[1] != request[1]:
+            raise minimalmodbus.InvalidResponseError(f"Response does not match the request: {response.hex()}")
+        if request[1] != 4 and response[2:6] != request[2:6]:
+            raise minimalmodbus.InvalidResponseError(f"Write was not confirmed: {response.hex()}")
+
+    def _communicate(self, request: bytes | bytearray, number_of_bytes_to_read: int) -> bytes:
+        """ Size the timeout to the response and let minimalmodbus handle the transaction """
+        if self.serial is None:
+            raise minimalmodbus.MasterReportedException("The serial port instance is None")
+
+        # The silent interval applies to the whole bus, not only to this slave
+        last_frame_ts = latest_frame_times.get(self.serial.port, 0.0)
+        wait = silent_interval(self.serial.baudrate) - (time.monotonic() - last_frame_ts)
+        if wait > 0:
+            time.sleep(wait)
+
+        # The request may still be on the wire when the read starts, so its length counts as well.
+        # The port's own timeout is the upper bound and is restored afterwards, the port may be shared.
+        # pyserial reconfigures the port on every timeout change, so only touch it when it differs.
+        port_timeout = self.serial.timeout
+        timeout = response_timeout(len(request) + number_of_bytes_to_read, self.serial.baudrate, self.response_margin)
+        if port_timeout is not None:
+            timeout = min(timeout, port_timeout)
+        if timeout != port_timeout:
+            self.serial.timeout = timeout
+
+        try:
+            return super()._communicate(bytes(request), number_of_bytes_to_read)
+        finally:
+            latest_frame_times[self.serial.port] = time.monotonic()
+            if timeout != port_timeout:
+                self.serial.timeout = port_timeout
+
+@lru_cache(maxsize=None)
+def get_instrument(port: str, baudrate: int = 38400) -> FastInstrument:
+    """ Open the instrument of a bus on demand, repeated calls return the same instrument """
+    # Servo sets the slave address before each call, so one instrument serves the whole bus
+    instrument = FastInstrument(port, 1)
+    instrument.serial.baudrate = baudrate
+    return instrument
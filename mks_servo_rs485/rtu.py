@@ -0,0 +1,89 @@
+""" This module provides helpers for building and checking raw Modbus RTU frames """
+import struct
+from array import array
+from collections.abc import Iterable
+from functools import lru_cache
+
+CRC16_POLYNOMIAL = 0xA001
+
+CRC_STRUCT = struct.Struct("<H")
+READ_REQUEST_STRUCT = struct.Struct(">BBHH")
+WRITE_REGISTER_PREFIX_STRUCT = struct.Struct(">BBH")
+WRITE_REGISTERS_PREFIX_STRUCT = struct.Struct(">BBHHB")
+
+
+def build_crc16_table() -> array:
+    """ Build the byte wise lookup table for the reflected Modbus CRC16 polynomial """
+    table = array("H")
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ CRC16_POLYNOMIAL if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+CRC16_TABLE = build_crc16_table()
+
+
+def modbus_crc(buf: bytes | bytearray | memoryview) -> int:
+    """ Calculate the Modbus CRC16 of the buffer """
+    table = CRC16_TABLE
+    crc = 0xFFFF
+    for byte in buf:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+
+def validate_frames(frames: Iterable[bytes | bytearray | memoryview]) -> list[bool]:
+    """ Check the CRC of captured frames, the CRC over a frame including its own CRC is zero """
+    return [modbus_crc(frame) == 0 for frame in frames]
+
+
+def append_crc(frame: bytes) -> bytes:
+    """ Append the little endian CRC16 to the frame """
+    return frame + CRC_STRUCT.pack(modbus_crc(frame))
+
+
+@lru_cache(maxsize=None)
+def registers_struct(number_of_registers: int) -> struct.Struct:
+    """ Get the compiled struct for the specified number of big endian registers """
+    return struct.Struct(f">{number_of_registers}H")
+
+
+@lru_cache(maxsize=256)
+def read_input_registers_frame(slave: int, registeraddress: int, number_of_registers: int) -> bytes:
+    """ Build the complete function 4 request including its CRC """
+    return append_crc(READ_REQUEST_STRUCT.pack(slave, 4, registeraddress, number_of_registers))
+
+
+@lru_cache(maxsize=256)
+def write_register_prefix(slave: int, registeraddress: int) -> bytes:
+    """ Build the function 6 request up to the register value """
+    return WRITE_REGISTER_PREFIX_STRUCT.pack(slave, 6, registeraddress)
+
+
+@lru_cache(maxsize=256)
+def write_registers_prefix(slave: int, registeraddress: int, number_of_registers: int) -> bytes:
+    """ Build the function 16 request up to the register values """
+    return WRITE_REGISTERS_PREFIX_STRUCT.pack(slave, 16, registeraddress, number_of_registers, 2 * number_of_registers)
+
+
+def write_register_frame(slave: int, registeraddress: int, value: int) -> bytearray:
+    """ Build the complete function 6 request including its CRC """
+    prefix = write_register_prefix(slave, registeraddress)
+    frame = bytearray(len(prefix) + 4)
+    frame[:len(prefix)] = prefix
+    registers_struct(1).pack_into(frame, len(prefix), value)
+    CRC_STRUCT.pack_into(frame, len(frame) - 2, modbus_crc(memoryview(frame)[:-2]))
+    return frame
+
+
+def write_registers_frame(slave: int, registeraddress: int, values: list[int]) -> bytearray:
+    """ Build the complete function 16 request including its CRC """
+    prefix = write_registers_prefix(slave, registeraddress, len(values))
+    frame = bytearray(len(prefix) + 2 * len(values) + 2)
+    frame[:len(prefix)] = prefix
+    registers_struct(len(values)).pack_into(frame, len(prefix), *values)
+    CRC_STRUCT.pack_into(frame, len(frame) - 2, modbus_crc(memoryview(frame)[:-2]))
+    return frame
@@ -1,8 +1,15 @@
 ''' Scanner Interface for devices '''
+import json
+import logging
+from pathlib import Path
 import minimalmodbus
 import serial
 import serial.tools.list_ports
 
+logger = logging.getLogger(__name__)
+
+CACHE_FILE = Path.home() / ".cache" / "mks-servo-rs485" / "bus.json"
+
 
 def list_serial_ports():
     ''' List serial ports '''
@@ -11,37 +18,92 @@ def list_serial_ports():
     return available_ports
 
 
-def scan_modbus(port, baudrate=38400, parity=serial.PARITY_NONE, stopbits=serial.STOPBITS_ONE,
-                timeout=0.5, start_addr=1, end_addr=254) -> list:
-    ''' List modbus devices '''
-    found_devices = []
-
-    # Set up the instrument with a dummy address (it will change in the loop)
-    instrument = minimalmodbus.Instrument(port, 1)  # Port name, and dummy slave address
+def create_scan_instrument(port, baudrate=38400, parity=serial.PARITY_NONE, stopbits=serial.STOPBITS_ONE,
+                           timeout=0.5) -> minimalmodbus.Instrument:
+    ''' Set up an instrument for probing addresses '''
+    # Dummy slave address, it is changed for every probed address
+    instrument = minimalmodbus.Instrument(port, 1)
     instrument.serial.baudrate = baudrate
     instrument.serial.timeout = timeout
     instrument.serial.parity = parity
     instrument.serial.stopbits = stopbits
     instrument.mode = minimalmodbus.MODE_RTU
+    return instrument
 
-    print("Scanning for Modbus devices...")
 
-    for address in range(start_addr, end_addr + 1):
-        instrument.address = address
-        try:
-            # Try to read a register to test if the device responds
-            # Register address and number of decimals
-            instrument.read_registers(functioncode=4, registeraddress=0x30, number_of_registers=3)
+def probe_address(instrument: minimalmodbus.Instrument, address: int) -> bool:
+    ''' Check if a device responds at the address '''
+    instrument.address = address
+    try:
+        # Try to read a register to test if the device responds
+        instrument.read_registers(functioncode=4, registeraddress=0x30, number_of_registers=3)
+        return True
+    except (minimalmodbus.NoResponseError, minimalmodbus.InvalidResponseError):
+        return False
+
+
+def scan_modbus(port, baudrate=38400, parity=serial.PARITY_NONE, stopbits=serial.STOPBITS_ONE,
+                timeout=0.5, start_addr=1, end_addr=254, max_devices=None) -> list:
+    ''' List modbus devices, stops early once max_devices are found '''
+    found_devices = []
+
+    instrument = create_scan_instrument(port, baudrate, parity, stopbits, timeout)
 
-            print(f"Device found at address {address}")
+    logger.info("Scanning for Modbus devices...")
+
+    for address in range(start_addr, end_addr + 1):
+        if probe_address(instrument, address):
+            logger.info("Device found at address %s", address)
             found_devices.append(address)
-        except (minimalmodbus.NoResponseError, minimalmodbus.InvalidResponseError):
+            if max_devices is not None and len(found_devices) >= max_devices:
+                break
+        else:
             # No response or invalid response - skip this address
-            print("No response from address:", address)
+            logger.debug("No response from address: %s", address)
 
     if found_devices:
-        print(f"Found devices at addresses: {found_devices}")
+        logger.info("Found devices at addresses: %s", found_devices)
     else:
-        print("No devices found.")
+        logger.info("No devices found.")
+
+    return found_devices
+
+
+def load_cached_addresses(port, baudrate) -> list:
+    ''' Load the addresses found on the bus by an earlier scan '''
+    try:
+        cache = json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+    return cache.get(f"{port}@{baudrate}", [])
 
+
+def save_cached_addresses(port, baudrate, addresses) -> None:
+    ''' Remember the addresses found on the bus '''
+    try:
+        cache = json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        cache = {}
+    cache[f"{port}@{baudrate}"] = addresses
+    try:
+        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        CACHE_FILE.write_text(json.dumps(cache), encoding="utf-8")
+    except OSError:
+        logger.warning("Could not write the scan cache: %s", CACHE_FILE)
+
+
+# Takes the same arguments as scan_modbus, which it falls back to
+def scan_modbus_cached(port, baudrate=38400, parity=serial.PARITY_NONE,  # pylint: disable=too-many-arguments,too-many-positional-arguments
+                       stopbits=serial.STOPBITS_ONE, timeout=0.5, start_addr=1, end_addr=254, max_devices=None) -> list:
+    ''' List modbus devices, probing the addresses of the last scan before scanning the whole bus '''
+    cached_devices = load_cached_addresses(port, baudrate)
+    if cached_devices:
+        instrument = create_scan_instrument(port, baudrate, parity, stopbits, timeout)
+        if all(probe_address(instrument, address) for address in cached_devices):
+            logger.info("Found cached devices at addresses: %s", cached_devices)
+            return cached_devices
+
+    found_devices = scan_modbus(port, baudrate, parity, stopbits, timeout, start_addr, end_addr, max_devices)
+    if found_devices:
+        save_cached_addresses(port, baudrate, found_devices)
     return found_devices
@@ -1,15 +1,46 @@
 """ This module provides a class for controlling the servo motor """
 import logging
-import math
 import time
 from dataclasses import dataclass
-from enum import Enum
+from enum import Enum, IntEnum
 import minimalmodbus
+from .rtu import registers_struct
+
+__all__ = [
+    "ENCODER_STEPS", "ANGLE_TO_AXIS", "AXIS_TO_ANGLE", "max_current_dict",
+    "Status", "MotorType", "GoBackToZeroStatus", "MotorStatus", "MotorWorkMode", "MotorActiveEnable",
+    "MotorDirection", "MotorBaudrate", "MotorEndStopActive", "MotorZeroMode", "MotorZeroSpeed",
+    "MotorSpeedParameterSaveClean", "Servo", "ServoBus",
+]
 
 ENCODER_STEPS = 16384
 ANGLE_TO_AXIS = ENCODER_STEPS/360
+AXIS_TO_ANGLE = 360/ENCODER_STEPS
+
+logger = logging.getLogger(__name__)
+
+IO_WRITE_MASK = 1 << 8
+# OUT1 and OUT2 register values indexed by out2 << 1 | out1
+IO_WRITE_VALUES = tuple((IO_WRITE_MASK | out1, IO_WRITE_MASK | out2) for out2 in (0, 1) for out1 in (0, 1))
+STATUS_POLL_PERIOD = 0.01
+# Registers that hold a setting, writes to any other register are commands that must not be cached or merged
+CONFIG_REGISTERS = frozenset({0x82, 0x83, 0x84, 0x85, 0x86, 0x87, 0x88, 0x89, 0x8A, 0x8E, 0x9B, 0x9E})
+HOMING_START_TIMEOUT = 1.0
+
+
+def split_int32(value: int) -> tuple[int, int]:
+    """ Split a signed 32 bit integer into its high and low 16 bit registers """
+    value &= 0xFFFFFFFF
+    return value >> 16, value & 0xFFFF
+
 
-class Status(Enum):
+def registers_to_int(registers: list[int], signed: bool = False) -> int:
+    """ Combine big endian 16 bit registers into a single integer """
+    raw = registers_struct(len(registers)).pack(*registers)
+    return int.from_bytes(raw, "big", signed=signed)
+
+
+class Status(IntEnum):
     """ Enum for the status of the servo motor """
     IN_1 = 0
     IN_2 = 1
@@ -29,14 +60,14 @@ max_current_dict = {
 }
 
 
-class GoBackToZeroStatus(Enum):
+class GoBackToZeroStatus(IntEnum):
     """ Enum for the status of the go back to zero pin """
     MOVING = 0
     SUCCESS = 1
     FAILURE = 2
 
 
-class MotorStatus(Enum):
+class MotorStatus(IntEnum):
     """ Enum for the status of the motor """
     READ_FAIL = 0
     STOP = 1
@@ -46,7 +77,12 @@ class MotorStatus(Enum):
     HOMING = 5
     CALIBRATION = 6
 
-class MotorWorkMode(Enum):
+
+go_back_to_zero_status_dict = {status.value: status for status in GoBackToZeroStatus}
+motor_status_dict = {status.value: status for status in MotorStatus}
+
+
+class MotorWorkMode(IntEnum):
     """ Enum for the work mode of the motor """
     CR_OPEN = 0
     CR_CLOSE = 1
@@ -56,19 +92,19 @@ class MotorWorkMode(Enum):
     SR_VFOC = 5
 
 
-class MotorActiveEnable(Enum):
+class MotorActiveEnable(IntEnum):
     """ Enum for the active enable of the motor """
     ACTIVE_LOW = 0
     ACTIVE_HIGH = 1
     ACTIVE_ALWAYS = 2
 
-class MotorDirection(Enum):
+class MotorDirection(IntEnum):
     """ Enum for the direction of the motor """
     CLOCKWISE = 0
     COUNTER_CLOCKWISE = 1
 
 
-class MotorBaudrate(Enum):
+class MotorBaudrate(IntEnum):
     """ Enum for the baudrate of the motor """
     BAUDRATE_9600 = 1
     BAUDRATE_19200 = 2
@@ -79,20 +115,20 @@ class MotorBaudrate(Enum):
     BAUDRATE_256000 = 7
 
 
-class MotorEndStopActive(Enum):
+class MotorEndStopActive(IntEnum):
     """ Enum for the end stop active """
     ACTIVE_LOW = 0
     ACTIVE_HIGH = 1
 
 
-class MotorZeroMode(Enum):
+class MotorZeroMode(IntEnum):
     """ Enum for the zero mode """
     DISABLE = 0
     DIR_MODE = 1
     NEAR_MODE = 2
 
 
-class MotorZeroSpeed(Enum):
+class MotorZeroSpeed(IntEnum):
     """ Enum for the zero speed """
     SLOWEST = 0
     SLOW = 1
@@ -100,13 +136,14 @@ class MotorZeroSpeed(Enum):
     FAST = 3
     FASTEST = 4
 
-class MotorSpeedParameterSaveClean(Enum):
+class MotorSpeedParameterSaveClean(IntEnum):
     """ Enum for the speed parameter save clean """
     SAVE = 0xC8
     CLEAN = 0xCA
 
+# The register and IO caches are per servo state on top of its settings
 @dataclass
-class Servo:
+class Servo:  # pylint: disable=too-many-instance-attributes
     """ Class for controlling the servo motor """
     mb: minimalmodbus.Instrument
     address: int
@@ -125,25 +162,75 @@ class Servo:
         self.full_steps = full_steps
         self.micro_steps = micro_steps
         self.motor_type = motor_type
+        self.reg_cache: dict[int, int] = {}
+        self.pending_writes: dict[int, int] = {}
+        self.io_cache: tuple[tuple[bool, bool, bool, bool], float] | None = None
 
     def __post_init__(self):
-        self.write_max_current()
-        self.write_hold_current()
-        self.write_subdivision()
+        self.configure()
+
+    def configure(self) -> None:
+        """ Write the current and microstep configuration back to back """
+        self.queue_configuration()
+        self.flush_writes()
+
+    def queue_configuration(self) -> None:
+        """ Queue the current and microstep configuration for the next flush """
+        self.queue_write(0x83, self.max_current)
+        self.queue_write(0x9B, self.hold_current_step())
+        self.queue_write(0x84, self.micro_steps)
+
+    def write_register(self, registeraddress: int, value: int) -> None:
+        """ Write a single holding register of this servo """
+        # The instrument may be shared by all servos on the bus
+        self.mb.address = self.address
+        self.mb.write_register(functioncode=6, registeraddress=registeraddress, value=value)
+
+    def write_registers(self, registeraddress: int, values: list[int]) -> None:
+        """ Write consecutive holding registers of this servo """
+        self.mb.address = self.address
+        self.mb.write_registers(registeraddress=registeraddress, values=values)
+
+    def write_register_cached(self, registeraddress: int, value: int) -> None:
+        """ Write a configuration register, skipping the write if the value is unchanged """
+        if self.reg_cache.get(registeraddress) == value:
+            return
+        self.write_register(registeraddress, value)
+        self.reg_cache[registeraddress] = value
+
+    def queue_write(self, registeraddress: int, value: int) -> None:
+        """ Queue a configuration register write, a later write to the same register replaces it """
+        if registeraddress not in CONFIG_REGISTERS:
+            raise ValueError(f"Register 0x{registeraddress:02X} is a command and cannot be queued")
+        self.pending_writes[registeraddress] = value
+
+    def flush_writes(self) -> None:
+        """ Send the queued configuration register writes back to back """
+        while self.pending_writes:
+            registeraddress = next(iter(self.pending_writes))
+            self.write_register_cached(registeraddress, self.pending_writes[registeraddress])
+            del self.pending_writes[registeraddress]
+
+    def invalidate_cache(self) -> None:
+        """ Forget all cached configuration register values """
+        self.reg_cache.clear()
+
+    def read_input_registers(self, registeraddress: int, number_of_registers: int) -> list[int]:
+        """ Read input registers of this servo """
+        self.mb.address = self.address
+        return self.mb.read_registers(functioncode=4, registeraddress=registeraddress,
+                                      number_of_registers=number_of_registers)
 
     def read_encoder_value_carry(self) -> tuple[int, int]:
         """ Read the encoder value """
-        encoder_value = self.mb.read_registers(functioncode=4, registeraddress=0x30, number_of_registers=3)
+        encoder_value = self.read_input_registers(0x30, 3)
         # The carry is in the first register (16 bits)
         value = encoder_value[2]  # Extract the first register value (assumes unsigned)
 
         # Combine the next two registers into a single 32-bit signed integer
-        msb = encoder_value[0]
-        lsb = encoder_value[1]
-        carry = (msb << 16) | lsb
+        carry = registers_to_int(encoder_value[0:2], signed=True)
 
-        if carry >= 0x80000000:
-            carry -= 0x100000000
+        if carry < 0:
             value = value - ENCODER_STEPS
 
         if value >= 0x8000:
@@ -153,141 +240,150 @@ class Servo:
 
     def read_encoder_value(self) -> int:
         """ Read the encoder value """
-        encoder_value = self.mb.read_registers(functioncode=4, registeraddress=0x31, number_of_registers=3)
-        value = encoder_value[0] << 16 | encoder_value[1] << 8 | encoder_value[2]
-        return value
+        encoder_value = self.read_input_registers(0x31, 3)
+        return registers_to_int(encoder_value, signed=True)
 
     def read_speed_rpm(self) -> int:
         """ Read the motor speed in RPM """
-        speed = self.mb.read_registers(functioncode=4, registeraddress=0x32, number_of_registers=1)
+        speed = self.read_input_registers(0x32, 1)
         return speed[0]
 
     def read_number_of_pulses(self) -> int:
         """ Read the number of pulses """
-        pulses = self.mb.read_registers(functioncode=4, registeraddress=0x33, number_of_registers=2)
-        pulses = pulses[0] << 16 | pulses[1]
-        return pulses
-
-    def read_io(self) -> tuple[bool, bool, bool, bool]:
-        """ Read the values of the servo's IO ports """
-        io = self.mb.read_registers(functioncode=4, registeraddress=0x34, number_of_registers=1)
-        io = io[0]
-        return bool(io & 0b1000), bool(io & 0b0100), bool(io & 0b0010), bool(io & 0b0001)
+        pulses = self.read_input_registers(0x33, 2)
+        return registers_to_int(pulses)
+
+    def read_io(self, max_age: float = 0.0) -> tuple[bool, bool, bool, bool]:
+        """ Read the values of the servo's IO ports, reusing a read that is younger than max_age seconds """
+        if self.io_cache is not None and time.monotonic() - self.io_cache[1] < max_age:
+            return self.io_cache[0]
+        io = self.read_input_registers(0x34, 1)[0]
+        values = bool(io & 0b1000), bool(io & 0b0100), bool(io & 0b0010), bool(io & 0b0001)
+        self.io_cache = values, time.monotonic()
+        return values
+
+    def read_io_port(self, port: Status) -> bool:
+        """ Read the value of a single IO port, always from the servo and without touching the read_io cache """
+        io = self.read_input_registers(0x34, 1)[0]
+        # IN_1 is the highest of the four bits, OUT_2 the lowest
+        return bool((io >> (3 - port)) & 1)
 
     def read_error_of_angle(self) -> int:
         """ Read the error of the angle """
-        error = self.mb.read_registers(functioncode=4, registeraddress=0x35, number_of_registers=2)
-        error = error[0] << 16 | error[1]
-        return error
+        error = self.read_input_registers(0x35, 2)
+        return registers_to_int(error, signed=True)
 
     def read_en_pin_status(self) -> bool:
         """ Read the status of the EN pin """
-        status = self.mb.read_registers(functioncode=4, registeraddress=0x3A, number_of_registers=1)
-        return bool(status[0])
+        registers = self.read_input_registers(0x3A, 1)
+        return bool(registers[0])
 
     def read_go_back_to_zero_status(self) -> GoBackToZeroStatus:
         """ Read the status of the go back to zero pin """
-        status = self.mb.read_registers(functioncode=4, registeraddress=0x3B, number_of_registers=1)
-        return GoBackToZeroStatus(status[0])
+        registers = self.read_input_registers(0x3B, 1)
+        return go_back_to_zero_status_dict.get(registers[0], GoBackToZeroStatus.FAILURE)
 
     def read_motor_shaft_protection_status(self) -> bool:
         """ Read the status of the motor shaft protection """
-        status = self.mb.read_registers(functioncode=4, registeraddress=0x3E, number_of_registers=1)
-        return bool(status[0])
+        registers = self.read_input_registers(0x3E, 1)
+        return bool(registers[0])
 
     def read_motor_status(self) -> MotorStatus:
         """ Read the status of the motor """
-        status = self.mb.read_registers(functioncode=4, registeraddress=0xF1, number_of_registers=1)
-        return MotorStatus(status[0])
+        status = self.read_input_registers(0xF1, 1)
+        return motor_status_dict.get(status[0], MotorStatus.READ_FAIL)
 
     def write_io(self, out1: bool, out2: bool) -> None:
         """ Write the specified values to OUT1 and OUT2 IO ports """
-        out1_mask = 1
-        out2_mask = 1
-        out1 = int(out1)
-        out2 = int(out2)
-        out_val_1 = out1_mask << 8 | out1
-        out_val_2 = out2_mask << 8 | out2
-        out_values = [out_val_1, out_val_2]
-        self.mb.write_registers(registeraddress=0x36, values=out_values)
+        # The high byte of each register is the write mask, the low byte the output value
+        self.write_registers(0x36, list(IO_WRITE_VALUES[bool(out2) << 1 | bool(out1)]))
+        # The cached outputs are stale now
+        self.io_cache = None
 
     def write_release_shaft_protection(self) -> None:
         """ Release the motor shaft protection """
-        self.mb.write_register(functioncode=6, registeraddress=0x3D, value=1)
+        self.write_register(0x3D, 1)
 
     def write_restore_default_parameters(self) -> None:
         """ Restore the default parameters """
-        self.mb.write_register(functioncode=6, registeraddress=0x3F, value=1)
+        self.write_register(0x3F, 1)
+        self.invalidate_cache()
 
     def write_restart(self) -> None:
         """ Restart the motor """
-        self.mb.write_register(functioncode=6, registeraddress=0x41, value=1)
+        self.write_register(0x41, 1)
+        self.invalidate_cache()
 
     def write_calibrate(self) -> None:
         """ Calibrate the servo motor """
-        self.mb.write_register(functioncode=6, registeraddress=0x80, value=1)
+        self.write_register(0x80, 1)
 
     def write_work_mode(self, mode: MotorWorkMode) -> None:
         """ Set the motor's work mode """
-        val_mode = mode.value
-        self.mb.write_register(functioncode=6, registeraddress=0x82, value=val_mode)
+        self.write_register_cached(0x82, mode.value)
 
     def write_max_current(self) -> None:
         """ Set the motor's maximum current in mA"""
-        self.mb.write_register(functioncode=6, registeraddress=0x83, value=self.max_current)
+        self.write_register_cached(0x83, self.max_current)
+
+    def hold_current_step(self) -> int:
+        """ Convert the hold current percentage to the register value """
+        # The register counts in 10% steps starting at 0 for 10%, partial steps round up
+        return min(max((self.hold_current_percent - 1) // 10, 0), 8)
 
     def write_hold_current(self) -> None:
         """ Set the motor's hold current """
-        hold_current_step = math.floor(float(self.hold_current_percent)/10)
-        self.mb.write_register(functioncode=6, registeraddress=0x9B, value=hold_current_step)
+        self.write_register_cached(0x9B, self.hold_current_step())
 
     def write_subdivision(self) -> None:
         """ Set the motor's microstep """
-        self.mb.write_register(functioncode=6, registeraddress=0x84, value=self.micro_steps)
+        self.write_register_cached(0x84, self.micro_steps)
 
     def write_active_enable(self, enable: MotorActiveEnable) -> None:
         """ Enable or disable the motor """
-        self.mb.write_register(functioncode=6, registeraddress=0x85, value=enable.value)
+        self.write_register_cached(0x85, enable.value)
 
     def write_direction(self, direction: MotorDirection) -> None:
         """ Set the motor's direction """
-        self.mb.write_register(functioncode=6, registeraddress=0x86, value=direction.value)
+        self.write_register_cached(0x86, direction.value)
 
     def write_auto_turn_off_screen(self, enable: bool) -> None:
         """ Enable or disable the auto turn off screen """
-        self.mb.write_register(functioncode=6, registeraddress=0x87, value=int(enable))
+        self.write_register_cached(0x87, int(enable))
 
     def write_shaft_protection(self, enable: bool) -> None:
         """ Enable or disable the motor shaft protection """
-        self.mb.write_register(functioncode=6, registeraddress=0x88, value=int(enable))
+        self.write_register_cached(0x88, int(enable))
 
     def write_subdivision_interpolation(self, enable: bool) -> None:
         """ Enable or disable the subdivision interpolation """
-        self.mb.write_register(functioncode=6, registeraddress=0x89, value=int(enable))
+        self.write_register_cached(0x89, int(enable))
 
     def write_baudrate(self, baudrate: MotorBaudrate) -> None:
         """ Set the motor's baudrate """
-        self.mb.write_register(functioncode=6, registeraddress=0x8A, value=baudrate.value)
+        self.write_register_cached(0x8A, baudrate.value)
 
     def write_slave_address(self, address: int) -> None:
         """ Set the motor's slave address """
-        self.mb.write_register(functioncode=6, registeraddress=0x8B, value=address)
+        self.write_register(0x8B, address)
+        # The servo answers on the new address from now on
+        self.address = address
 
     def write_modbus(self, enable: bool) -> None:
         """ Enable or disable the modbus """
-        self.mb.write_register(functioncode=6, registeraddress=0x8E, value=int(enable))
+        self.write_register_cached(0x8E, int(enable))
 
     def write_lock_key(self, enable: bool) -> None:
         """ Enable or disable the lock key """
-        self.mb.write_register(functioncode=6, registeraddress=0x8F, value=int(enable))
+        self.write_register(0x8F, int(enable))
 
     def write_zero_axis(self) -> None:
         """ Zero the motor's axis """
-        self.mb.write_register(functioncode=6, registeraddress=0x92, value=1)
+        self.write_register(0x92, 1)
 
     def write_serial(self, enable: bool) -> None:
         """ Enable or disable the serial """
-        self.mb.write_register(functioncode=6, registeraddress=0x8F, value=int(enable))
+        self.write_register(0x8F, int(enable))
 
     def write_go_home_parameter(self, end_stop_level: MotorEndStopActive, home_dir: MotorDirection,
                                 speed: int, enable_end_stop_limit: bool ) -> None:
@@ -296,27 +392,25 @@ class Servo:
         speed_low = speed & 0xFF
 
         values = [end_stop_level.value, home_dir.value, speed_high, speed_low, int(enable_end_stop_limit)]
-        self.mb.write_registers(registeraddress=0x90, values=values)
+        self.write_registers(0x90, values)
 
     def write_no_limit_go_home_parameter(self, max_return_angle: float, no_switch_go_home: bool,
                                          no_limit_current: int) -> None:
         """ Set the no limit go home parameter """
         axis = int(max_return_angle * ANGLE_TO_AXIS)
-        axis_low = axis & 0xFFFF
-        axis_high = (axis >> 16) & 0xFFFF
-        values = [axis_high, axis_low, int(no_switch_go_home), no_limit_current]
-        self.mb.write_registers(registeraddress=0x94, values=values)
+        values = [*split_int32(axis), int(no_switch_go_home), no_limit_current]
+        self.write_registers(0x94, values)
         time.sleep(0.5)
 
     def write_end_stop_port_remap(self, enable: bool) -> None:
         """ Enable or disable the end stop port remap """
-        self.mb.write_register(functioncode=6, registeraddress=0x9E, value=int(enable))
+        self.write_register_cached(0x9E, int(enable))
 
     def write_zero_mode_parameter(self, set_zero: bool, zero_mode: MotorZeroMode,
                                   zero_dir: MotorDirection, zero_speed: MotorZeroSpeed) -> None:
         """ Set the zero mode parameter """
-        values = [zero_mode, set_zero, zero_speed, zero_dir]
-        self.mb.write_registers(registeraddress=0x9A, values=values)
+        values = [zero_mode.value, int(set_zero), zero_speed.value, zero_dir.value]
+        self.write_registers(0x9A, values)
 
     def write_single_turn_zero_return_and_position_error_protection(self,
                                                                     position_protection: bool,
@@ -324,21 +418,25 @@ class Servo:
                                                                     time: int,
                                                                     errors: int) -> None:
         """ Enable or disable the position error protection """
-        bool_byte = single_turn_zero_return << 1 | position_protection
+        bool_byte = int(single_turn_zero_return) << 1 | int(position_protection)
         values = [bool_byte, time, errors]
-        self.mb.write_registers(registeraddress=0x9D, values=values)
+        self.write_registers(0x9D, values)
+
+    def start_go_home(self) -> None:
+        """ Send the homing command without waiting for the motor """
+        self.write_register(0x91, 1)
 
     def go_home(self) -> None:
         """ Move the motor to the home position """
-        self.mb.write_register(functioncode=6, registeraddress=0x91, value=1)
-        self.wait_until_motor_status(MotorStatus.STOP)
-        time.sleep(1)
+        self.start_go_home()
+        # The motor may still report STOP right after the command, so wait for homing to start first
+        self.wait_while_motor_status(MotorStatus.STOP, timeout=HOMING_START_TIMEOUT)
         self.wait_until_motor_status(MotorStatus.STOP)
 
 
     def emergency_stop(self) -> None:
         """ Stop the motor """
-        self.mb.write_register(functioncode=6, registeraddress=0xF7, value=1)
+        self.write_register(0xF7, 1)
 
     def move_by_speed(self, direction: MotorDirection, acc: int, speed: int) -> None:
         """ Move the motor at the specified speed """
@@ -347,53 +445,61 @@ class Servo:
 
         dir_acc = direction.value << 8 | acc
         values = [dir_acc, speed]
-        self.mb.write_registers(registeraddress=0xF6, values=values)
+        self.write_registers(0xF6, values)
 
     def save_speed_parameters(self, save_clean: MotorSpeedParameterSaveClean) -> None:
         """ Save or clean the speed parameters """
-        self.mb.write_register(functioncode=6, registeraddress=0xFF, value=save_clean.value)
+        self.write_register(0xFF, save_clean.value)
 
-    def move_relative_by_pulses(self, direction: MotorDirection, acc: int, speed: int, pulses: int) -> None:
-        """ Move the motor by the specified number of pulses """
+    def start_move_relative_by_pulses(self, direction: MotorDirection, acc: int, speed: int, pulses: int) -> None:
+        """ Send the move command without waiting for the motor """
         self.check_pulses(pulses)
         self.check_speed(speed)
         self.check_acceleration(acc)
         dir_acc = direction.value << 8 | acc
-        pulses_low = pulses & 0xFFFF
-        pulses_high = (pulses >> 16) & 0xFFFF
-        values = [dir_acc, speed, pulses_high, pulses_low]
-        self.mb.write_registers(registeraddress=0xFD, values=values)
+        values = [dir_acc, speed, *split_int32(pulses)]
+        self.write_registers(0xFD, values)
+
+    def move_relative_by_pulses(self, direction: MotorDirection, acc: int, speed: int, pulses: int) -> None:
+        """ Move the motor by the specified number of pulses """
+        self.start_move_relative_by_pulses(direction, acc, speed, pulses)
         self.wait_until_motor_status(MotorStatus.STOP)
 
-    def move_absolute_by_pulses(self, acc: int, speed: int, pulses: int) -> None:
-        """ Move the motor to the specified number of pulses """
+    def start_move_absolute_by_pulses(self, acc: int, speed: int, pulses: int) -> None:
+        """ Send the move command without waiting for the motor """
         self.check_pulses(pulses)
         self.check_speed(speed)
         self.check_acceleration(acc)
-        pulses_low = pulses & 0xFFFF
-        pulses_high = (pulses >> 16) & 0xFFFF
-        values = [acc, speed, pulses_high, pulses_low]
-        self.mb.write_registers(registeraddress=0xFE, values=values)
+        values = [acc, speed, *split_int32(pulses)]
+        self.write_registers(0xFE, values)
+
+    def move_absolute_by_pulses(self, acc: int, speed: int, pulses: int) -> None:
+        """ Move the motor to the specified number of pulses """
+        self.start_move_absolute_by_pulses(acc, speed, pulses)
         self.wait_until_motor_status(MotorStatus.STOP)
 
+    def start_move_to_relative_axis(self, acc: int, speed: int, axis: int) -> None:
+        """ Send the move command without waiting for the motor """
+        self.check_acceleration(acc)
+        self.check_speed(speed)
+        values = [acc, speed, *split_int32(axis)]
+        self.write_registers(0xF4, values)
+
     def move_to_relative_axis(self, acc: int, speed: int, axis: int) -> None:
         """ Move the motor by the specified angle """
+        self.start_move_to_relative_axis(acc, speed, axis)
+        self.wait_until_motor_status(MotorStatus.STOP)
+
+    def start_move_to_absolute_axis(self, acc: int, speed: int, axis: int) -> None:
+        """ Send the move command without waiting for the motor """
         self.check_acceleration(acc)
         self.check_speed(speed)
-        axis_low = axis & 0xFFFF
-        axis_high = (axis >> 16) & 0xFFFF
-        values = [acc, speed, axis_high, axis_low]
-        self.mb.write_registers(registeraddress=0xF4, values=values)
-        self.wait_until_motor_status(MotorStatus.STOP)
+        values = [acc, speed, *split_int32(axis)]
+        self.write_registers(0xF5, values)
 
     def move_to_absolute_axis(self, acc: int, speed: int, axis: int) -> None:
         """ Move the motor to the specified angle """
-        self.check_acceleration(acc)
-        self.check_speed(speed)
-        axis_low = axis & 0xFFFF
-        axis_high = (axis >> 16) & 0xFFFF
-        values = [acc, speed, axis_high, axis_low]
-        self.mb.write_registers(registeraddress=0xF5, values=values)
+        self.start_move_to_absolute_axis(acc, speed, axis)
         self.wait_until_motor_status(MotorStatus.STOP)
 
     def move_to_relative_angle(self, acc: int, speed: int, angle: float) -> None:
@@ -406,13 +512,30 @@ class Servo:
         axis = int(angle * ANGLE_TO_AXIS)
         self.move_to_absolute_axis(acc, speed, axis)
 
-    def wait_until_motor_status(self, scope_status: MotorStatus) -> None:
-        """ Wait until the motor stops """
+    def wait_until_motor_status(self, scope_status: MotorStatus, poll_period: float = STATUS_POLL_PERIOD) -> None:
+        """ Wait until the motor reaches the specified status """
+        # Poll on absolute deadlines so the bus load stays at the poll rate without drifting
+        next_poll = time.monotonic()
         while 1:
             status = self.read_motor_status()
-            logging.debug("Motor status: %s", status)
+            logger.debug("Motor status: %s", status.name)
             if status == scope_status:
                 break
+            next_poll += poll_period
+            time.sleep(max(0.0, next_poll - time.monotonic()))
+
+    def wait_while_motor_status(self, scope_status: MotorStatus, timeout: float,
+                                poll_period: float = STATUS_POLL_PERIOD) -> None:
+        """ Wait until the motor leaves the specified status or the timeout expires """
+        deadline = time.monotonic() + timeout
+        next_poll = time.monotonic()
+        while time.monotonic() < deadline:
+            status = self.read_motor_status()
+            logger.debug("Motor status: %s", status.name)
+            if status != scope_status:
+                break
+            next_poll += poll_period
+            time.sleep(max(0.0, next_poll - time.monotonic()))
 
     def check_speed(self, speed: int) -> None:
         """ Check the speed """
@@ -429,8 +552,30 @@ class Servo:
         if pulses < 0 or pulses > 0xFFFFFF:
             raise ValueError("Pulses must be between 0 and 0xFFFFFF")
 
-    def read_angle_carry(self):
+    def read_angle_carry(self) -> float:
+        """ Read the angle of the motor in degrees """
         carry, value = self.read_encoder_value_carry()
-        angle = carry / ANGLE_TO_AXIS + value / ANGLE_TO_AXIS
+        angle = (carry + value) * AXIS_TO_ANGLE
 
         return angle
+
+
+@dataclass
+class ServoBus:
+    """ Class for the servos sharing one RS485 bus, the servos set their address on the shared instrument """
+    servos: list[Servo]
+
+    def __post_init__(self):
+        if len({id(servo.mb) for servo in self.servos}) > 1:
+            raise ValueError("All servos of a bus must share one instrument")
+
+    def configure(self) -> None:
+        """ Write the current and microstep configuration of all servos in one burst """
+        for servo in self.servos:
+            servo.queue_configuration()
+        self.flush()
+
+    def flush(self) -> None:
+        """ Send the queued configuration writes of all servos in one burst """
+        for servo in self.servos:
+            servo.flush_writes()
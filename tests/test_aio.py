@@ -0,0 +1,67 @@
+""" Check the angle watcher of AsyncServo against a fake servo """
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from mks_servo_rs485.aio import AsyncServo
+from mks_servo_rs485.servo import MotorStatus
+
+
+class FakeServo:
+    """ Servo that is always stopped and reports a settable angle """
+    def __init__(self) -> None:
+        self.angle = 0.0
+        self.angle_reads = 0
+
+    def read_motor_status(self) -> MotorStatus:
+        """ The motor never reports a move """
+        return MotorStatus.STOP
+
+    def read_angle_carry(self) -> float:
+        """ Return the current angle """
+        self.angle_reads += 1
+        return self.angle
+
+
+class TestWatchAngle(unittest.TestCase):
+    """ watch_angle must report every change of the angle """
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.servo = FakeServo()
+        self.async_servo = AsyncServo(self.servo, self.executor)  # type: ignore[arg-type]
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_move_between_idle_ticks(self):
+        """ A move that starts and ends between two idle polls is still yielded """
+        async def watch() -> list[float]:
+            angles = []
+            watcher = self.async_servo.watch_angle(idle_period=0.05, settle_time=0.0)
+            angles.append(await anext(watcher))
+            # The whole move happens while the watcher sleeps and the motor reports STOP again
+            self.servo.angle = 90.0
+            angles.append(await asyncio.wait_for(anext(watcher), timeout=1.0))
+            await watcher.aclose()
+            return angles
+
+        self.assertEqual(asyncio.run(watch()), [0.0, 90.0])
+
+    def test_min_change(self):
+        """ Changes up to min_change are not yielded """
+        async def watch() -> list[float]:
+            angles = []
+            watcher = self.async_servo.watch_angle(idle_period=0.01, settle_time=0.0, min_change=1.0)
+            angles.append(await anext(watcher))
+            self.servo.angle = 0.5
+            while self.servo.angle_reads < 5:
+                await asyncio.sleep(0.01)
+            self.servo.angle = 2.0
+            angles.append(await asyncio.wait_for(anext(watcher), timeout=1.0))
+            await watcher.aclose()
+            return angles
+
+        self.assertEqual(asyncio.run(watch()), [0.0, 2.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
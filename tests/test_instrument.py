@@ -0,0 +1,132 @@
+""" Compare the hand built Modbus RTU frames of FastInstrument against minimalmodbus """
+import random
+import unittest
+import minimalmodbus
+from mks_servo_rs485.instrument import FastInstrument
+from mks_servo_rs485.rtu import append_crc, validate_frames
+
+
+class FakeSerial:
+    """ Serial port that records the requests and answers each with a valid response """
+    def __init__(self) -> None:
+        self.port = "fake"
+        self.baudrate = 38400
+        self.timeout = 0.05
+        self.is_open = True
+        self.requests: list[bytes] = []
+        self.response = b""
+
+    def open(self) -> None:
+        """ Open the port """
+        self.is_open = True
+
+    def close(self) -> None:
+        """ Close the port """
+        self.is_open = False
+
+    def write(self, data: bytes) -> int:
+        """ Record the request and prepare its response """
+        request = bytes(data)
+        self.requests.append(request)
+        if request[1] == 4:
+            number_of_registers = int.from_bytes(request[4:6], "big")
+            payload = bytes(range(2 * number_of_registers))
+            self.response = append_crc(request[:2] + bytes([len(payload)]) + payload)
+        else:
+            self.response = append_crc(request[:6])
+        return len(request)
+
+    def read(self, size: int) -> bytes:
+        """ Return the prepared response """
+        response, self.response = self.response[:size], self.response[size:]
+        return response
+
+    def reset_input_buffer(self) -> None:
+        """ Drop unread bytes """
+        self.response = b""
+
+    def reset_output_buffer(self) -> None:
+        """ Nothing is buffered on write """
+
+
+class TestFrames(unittest.TestCase):
+    """ FastInstrument must put the same bytes on the wire as minimalmodbus """
+    def setUp(self):
+        self.fast_serial = FakeSerial()
+        self.reference_serial = FakeSerial()
+        self.fast = FastInstrument(self.fast_serial, 3)
+        self.reference = minimalmodbus.Instrument(self.reference_serial, 3)
+
+    def assert_same_requests(self) -> None:
+        """ Check that both instruments sent identical requests """
+        self.assertEqual(self.fast_serial.requests, self.reference_serial.requests)
+
+    def test_read_input_registers(self):
+        """ Function 4 requests and the decoded registers match """
+        for number_of_registers in (1, 2, 3, 15, 125):
+            self.assertEqual(self.fast.read_registers(0x30, number_of_registers, functioncode=4),
+                             self.reference.read_registers(0x30, number_of_registers, functioncode=4))
+        self.assert_same_requests()
+
+    def test_write_register(self):
+        """ Function 6 requests match """
+        for value in (0, 1, 0x1234, 0xFFFF):
+            self.fast.write_register(0x8B, value, functioncode=6)
+            self.reference.write_register(0x8B, value, functioncode=6)
+        self.assert_same_requests()
+
+    def test_write_registers(self):
+        """ Function 16 requests match """
+        for values in ([0x0101], [0x0100, 0x0101], [0x0A, 3000, 0, 0xFFFF], list(range(123))):
+            self.fast.write_registers(0xF5, values)
+            self.reference.write_registers(0xF5, values)
+        self.assert_same_requests()
+
+    def test_crc(self):
+        """ The table driven CRC matches minimalmodbus """
+        rng = random.Random(0)
+        frames = [bytes(rng.randrange(256) for _ in range(rng.randrange(1, 64))) for _ in range(100)]
+        for frame in frames:
+            self.assertEqual(append_crc(frame)[-2:], minimalmodbus._calculate_crc(frame))  # pylint: disable=protected-access
+        self.assertEqual(validate_frames(append_crc(frame) for frame in frames), [True] * len(frames))
+
+
+class TestValidation(unittest.TestCase):
+    """ FastInstrument must reject what minimalmodbus rejects before anything is sent """
+    def setUp(self):
+        self.serial = FakeSerial()
+        self.fast = FastInstrument(self.serial, 3)
+
+    def test_write_registers(self):
+        """ Empty, oversized and out of range value lists are rejected """
+        with self.assertRaises(ValueError):
+            self.fast.write_registers(0xF5, [])
+        with self.assertRaises(ValueError):
+            self.fast.write_registers(0xF5, [0] * 124)
+        with self.assertRaises(ValueError):
+            self.fast.write_registers(0xF5, [0x10000])
+        with self.assertRaises(ValueError):
+            self.fast.write_registers(0xF5, [-1])
+        with self.assertRaises(TypeError):
+            self.fast.write_registers(0xF5, (1, 2))  # type: ignore[arg-type]
+        self.assertEqual(self.serial.requests, [])
+
+    def test_write_register(self):
+        """ Out of range values are rejected """
+        with self.assertRaises(ValueError):
+            self.fast.write_register(0x8B, 0x10000, functioncode=6)
+        with self.assertRaises(ValueError):
+            self.fast.write_register(0x8B, -1, functioncode=6)
+        self.assertEqual(self.serial.requests, [])
+
+    def test_read_registers(self):
+        """ Reads of zero or more than 125 registers are rejected """
+        with self.assertRaises(ValueError):
+            self.fast.read_registers(0x30, 0, functioncode=4)
+        with self.assertRaises(ValueError):
+            self.fast.read_registers(0x30, 126, functioncode=4)
+        self.assertEqual(self.serial.requests, [])
+
+
+if __name__ == "__main__":
+    unittest.main()